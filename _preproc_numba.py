@@ -0,0 +1,70 @@
+"""Numba port of OpenCV's Gaussian adaptive threshold, used when cv2 is not installed."""
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True)
+def _gaussian_kernel(block):
+    """
+    Build the normalized 1-D Gaussian kernel OpenCV uses for a given block size.
+
+    Args:
+        block (int): Odd kernel size in pixels.
+
+    Returns:
+        numpy.ndarray: Kernel weights summing to 1.
+    """
+    sigma = 0.3 * ((block - 1) * 0.5 - 1) + 0.8
+    half = block // 2
+    kernel = np.empty(block, dtype=np.float32)
+    total = 0.0
+    for i in range(block):
+        x = i - half
+        kernel[i] = np.exp(-(x * x) / (2.0 * sigma * sigma))
+        total += kernel[i]
+    for i in range(block):
+        kernel[i] /= total
+    return kernel
+
+
+@njit(parallel=True, cache=True)
+def binarize(gray, out, block=31, C=15):
+    """
+    Gaussian adaptive threshold, same result as
+    cv2.adaptiveThreshold(gray, 255, ADAPTIVE_THRESH_GAUSSIAN_C, THRESH_BINARY, block, C).
+
+    The blur is applied as two separable passes with replicated borders, and
+    rows are processed in parallel.
+
+    Args:
+        gray (numpy.ndarray): Single-channel uint8 image.
+        out (numpy.ndarray): uint8 array of the same shape, receives the result.
+        block (int): Odd neighbourhood size for the local mean.
+        C (int): Constant subtracted from the local mean.
+
+    Returns:
+        numpy.ndarray: `out`, with pixels set to 255 or 0.
+    """
+    h, w = gray.shape
+    half = block // 2
+    kernel = _gaussian_kernel(block)
+    blurred = np.empty((h, w), dtype=np.float32)
+
+    for y in prange(h):
+        for x in range(w):
+            acc = 0.0
+            for i in range(block):
+                xx = min(max(x + i - half, 0), w - 1)
+                acc += kernel[i] * gray[y, xx]
+            blurred[y, x] = acc
+
+    for y in prange(h):
+        for x in range(w):
+            acc = 0.0
+            for i in range(block):
+                yy = min(max(y + i - half, 0), h - 1)
+                acc += kernel[i] * blurred[yy, x]
+            mean = np.int32(acc + 0.5)
+            out[y, x] = 255 if np.int32(gray[y, x]) > mean - C else 0
+
+    return out
@@ -1,64 +1,480 @@
 import asyncio
+import hashlib
+import io
+import math
 import os
 import json
+import multiprocessing
+import pathlib
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 import fitz  # PyMuPDF
+import numpy as np
+import pandas as pd
 import pdfplumber
 import camelot
 import pytesseract
-from pdf2image import convert_from_path
-from unstructured.partition.pdf import partition_pdf
 
-
-def extract_images_from_pdf(file_path, output_folder):
+try:
+    import cv2
+except ImportError:  # installed without camelot-py[cv]; OCR pages are binarized with Numba
+    cv2 = None
+
+try:
+    import tesserocr
+except ImportError:  # OCR falls back to batched Tesseract subprocesses via pytesseract
+    tesserocr = None
+
+# Upper bound on Tesseract runs in flight across every PDF being processed
+_OCR_CONCURRENCY = max(1, int(os.getenv("OCR_CONCURRENCY", os.cpu_count() or 1)))
+# A process-shared semaphore, so direct calls in this process and the pool workers
+# (which receive this same object) draw from one budget
+_OCR_SEM = multiprocessing.BoundedSemaphore(_OCR_CONCURRENCY)
+
+# Per-page OCR and table results, keyed on the MD5 of the PDF bytes
+_CACHE_DIR = pathlib.Path("~/.pdfextract_cache").expanduser()
+# Bump the version when table detection changes, so stale page results are ignored
+_TABLES_STAGE = "tables_v1"
+
+# In-process Tesseract: a small thread pool per process, each thread keeping its
+# own long-lived API (tesserocr releases the GIL while recognizing)
+_TESS_THREADS = min(4, _OCR_CONCURRENCY)
+_TESS_POOL = None
+_TESS_LOCAL = threading.local()
+
+# Pages per Tesseract subprocess: small enough that OCR starts while later chunks
+# render, and far below the 50+ page image lists Tesseract can hang on
+_OCR_BATCH_SIZE = 10
+
+# Adaptive OCR resolution: aim for this many pixels of page height, kept between
+# _OCR_MIN_DPI (Tesseract accuracy collapses below ~100 DPI) and _OCR_MAX_DPI
+_OCR_TARGET_HEIGHT = 1600
+_OCR_MIN_DPI = 100
+_OCR_MAX_DPI = 200
+
+# Borderless-table probe: a word gap this many characters wide is a column gutter,
+# and a table needs at least this many lines with a gutter in the same place
+_TABLE_GAP_CHARS = 2
+_TABLE_MIN_ROWS = 3
+
+
+def extract_images_from_pdf(pdf_doc, base_name, output_folder):
     """
-    Extract all embedded images from the PDF and save them as PNG files.
+    Extract all embedded images from an open PDF and save them to disk.
+
+    Images are written in their stored format (PNG, JPEG, ...) without being
+    decoded. Only CMYK images are decoded and converted to RGB PNG files.
+    An image that appears on several pages (logos, headers) is saved once and
+    its path is listed for every occurrence.
 
     Args:
-        file_path (str): Path to the PDF file.
+        pdf_doc (fitz.Document): Already opened PyMuPDF document.
+        base_name (str): Prefix for the saved image file names.
         output_folder (str): Folder where images will be saved.
 
     Returns:
         list: List of saved image file paths.
     """
     os.makedirs(output_folder, exist_ok=True)
-    base_name = os.path.splitext(os.path.basename(file_path))[0]
     image_paths = []
+    seen = {}  # xref -> path of the file already written for it
 
-    pdf_doc = fitz.open(file_path)
     for page_num, page in enumerate(pdf_doc, start=1):
         images = page.get_images(full=True)
         for img_index, img in enumerate(images, start=1):
             xref = img[0]
-            pix = fitz.Pixmap(pdf_doc, xref)
+            if xref in seen:
+                image_paths.append(seen[xref])
+                continue
 
-            if pix.n < 5:  # GRAY or RGB
-                img_path = os.path.join(output_folder, f"{base_name}_page{page_num}_img{img_index}.png")
-                pix.save(img_path)
+            img_stem = os.path.join(output_folder, f"{base_name}_page{page_num}_img{img_index}")
+            info = pdf_doc.extract_image(xref)
+
+            if info and info["colorspace"] != 4:  # GRAY or RGB: write the raw stream
+                img_path = f"{img_stem}.{info['ext']}"
+                with open(img_path, "wb") as f:
+                    f.write(info["image"])
             else:  # CMYK: convert to RGB first
-                pix = fitz.Pixmap(fitz.csRGB, pix)
-                img_path = os.path.join(output_folder, f"{base_name}_page{page_num}_img{img_index}.png")
+                pix = fitz.Pixmap(pdf_doc, xref)
+                if pix.colorspace and pix.colorspace.n >= 4:
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+                img_path = f"{img_stem}.png"
                 pix.save(img_path)
 
+            seen[xref] = img_path
             image_paths.append(img_path)
 
     return image_paths
 
 
-def _ocr_text(pdf_path):
+def _cache_load(digest, page_num, stage):
+    """
+    Load a cached per-page result.
+
+    Args:
+        digest (str): MD5 hex digest of the PDF bytes.
+        page_num (int): 1-based page number.
+        stage (str): Name of the extraction stage, e.g. "ocr_auto" or "tables_v1".
+
+    Returns:
+        The cached JSON value, or None if nothing is cached.
+    """
+    cache_path = _CACHE_DIR / digest / f"page_{page_num}_{stage}.json"
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_store(digest, page_num, stage, value):
+    """
+    Store a per-page result in the cache.
+
+    Args:
+        digest (str): MD5 hex digest of the PDF bytes.
+        page_num (int): 1-based page number.
+        stage (str): Name of the extraction stage, e.g. "ocr_auto" or "tables_v1".
+        value: JSON-serializable result to store.
+    """
+    cache_path = _CACHE_DIR / digest / f"page_{page_num}_{stage}.json"
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent workers never read a partial file
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Could not write cache file {cache_path}: {e}")
+
+
+def _prep(img_np):
+    """
+    Binarize a page image for OCR.
+
+    Tesseract is both faster and more accurate on clean black-and-white input,
+    so grayscale pages go through an adaptive threshold first. OpenCV is used
+    when installed, otherwise the equivalent Numba kernel from
+    `_preproc_numba`. Without either, the grayscale page is returned as is.
+
+    Args:
+        img_np (numpy.ndarray): Page image, grayscale (H, W) or RGB (H, W, 3).
+
+    Returns:
+        numpy.ndarray: New single-channel image, binary when a backend is available.
+    """
+    if img_np.ndim == 2:
+        gray = img_np
+    elif cv2 is not None:
+        gray = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
+    else:
+        gray = (img_np[..., :3] @ np.array([0.299, 0.587, 0.114])).round().astype(np.uint8)
+
+    if cv2 is not None:
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+    try:
+        # Imported only when needed: loading numba adds a noticeable delay to
+        # every start and every pool worker
+        from _preproc_numba import binarize
+    except ImportError:
+        return gray.copy()  # callers may release the buffer gray points into
+    return binarize(gray, np.empty_like(gray), 31, 15)
+
+
+def _ocr_page_dpi(page, ocr_dpi=None):
+    """
+    Pick the resolution a page is rendered at for OCR.
+
+    Tesseract time grows with the pixel count, so by default pages are
+    rendered to about `_OCR_TARGET_HEIGHT` pixels tall, kept between
+    `_OCR_MIN_DPI` and `_OCR_MAX_DPI` so large-format pages stay legible.
+
+    Args:
+        page (fitz.Page): Page to render.
+        ocr_dpi (int): Fixed resolution that overrides the adaptive choice.
+
+    Returns:
+        int: Resolution in dots per inch.
+    """
+    if ocr_dpi:
+        return ocr_dpi
+    return max(_OCR_MIN_DPI, min(_OCR_MAX_DPI, round(_OCR_TARGET_HEIGHT * 72 / page.rect.height)))
+
+
+def _render_page(page, dpi):
+    """
+    Render one PDF page and binarize it for OCR.
+
+    Args:
+        page (fitz.Page): Page to render.
+        dpi (int): Resolution used to render the page.
+
+    Returns:
+        numpy.ndarray: Single-channel binary image from `_prep`.
+    """
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    # View the pixmap's own buffer; pix.samples would copy the whole page
+    img_np = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width)
+    return _prep(img_np)
+
+
+def _iter_pdf_images(pdf_doc, page_indices, tmp_dir, ocr_dpi=None, chunk=10):
+    """
+    Render pages to binarized PNG files, one chunk at a time.
+
+    Pages are only rendered when the next chunk is requested, so the caller
+    controls how many page images exist at once. A chunk never mixes
+    resolutions, so it can be OCRed with a single `--dpi` value.
+
+    Args:
+        pdf_doc (fitz.Document): Already opened PyMuPDF document.
+        page_indices (list): 0-based indices of the pages to render.
+        tmp_dir (str): Folder the PNG files are written to; when None the
+            binarized arrays are yielded in place of file paths.
+        ocr_dpi (int): Fixed resolution; chosen per page by `_ocr_page_dpi` when None.
+        chunk (int): Maximum number of pages per yielded chunk.
+
+    Yields:
+        tuple: (dpi, batch) where batch lists (page_index, img_path) tuples,
+        or (page_index, numpy.ndarray) tuples when `tmp_dir` is None.
+    """
+    batch, batch_dpi = [], None
+    for page_index in page_indices:
+        page = pdf_doc[page_index]
+        dpi = _ocr_page_dpi(page, ocr_dpi)
+        if batch and (dpi != batch_dpi or len(batch) == chunk):
+            yield batch_dpi, batch
+            batch = []
+        batch_dpi = dpi
+
+        binary = _render_page(page, dpi)
+        if tmp_dir is None:
+            batch.append((page_index, binary))
+            continue
+        img_path = os.path.join(tmp_dir, f"page_{page_index + 1:04d}.png")
+        if cv2 is not None:
+            cv2.imwrite(img_path, binary)
+        else:
+            height, width = binary.shape
+            fitz.Pixmap(fitz.csGRAY, width, height, binary.tobytes(), False).save(img_path)
+        batch.append((page_index, img_path))
+    if batch:
+        yield batch_dpi, batch
+
+
+def _tesserocr_text(binary, dpi):
+    """
+    OCR one binarized page with the calling thread's tesserocr API.
+
+    Meant to run on `_tesserocr_pool`. Each pool thread loads its API, and
+    with it the language model, once and reuses it for every following page
+    and file.
+
+    Args:
+        binary (numpy.ndarray): Single-channel page image from `_prep`.
+        dpi (int): Resolution the page was rendered at.
+
+    Returns:
+        str: Extracted text from OCR.
+    """
+    api = getattr(_TESS_LOCAL, "api", None)
+    if api is None:
+        api = _TESS_LOCAL.api = tesserocr.PyTessBaseAPI(lang="eng")
+    height, width = binary.shape
+    with _OCR_SEM:
+        api.SetImageBytes(binary.tobytes(), width, height, 1, width)
+        api.SetSourceResolution(dpi)
+        return api.GetUTF8Text()
+
+
+def _tesserocr_pool():
+    """
+    Return this process's tesserocr thread pool, creating it on first use.
+
+    Created lazily so forked pool workers each start their own threads.
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: Pool of `_TESS_THREADS` threads.
+    """
+    global _TESS_POOL
+    if _TESS_POOL is None:
+        _TESS_POOL = ThreadPoolExecutor(max_workers=_TESS_THREADS, thread_name_prefix="tesserocr")
+    return _TESS_POOL
+
+
+def _tesseract_batch(list_path, dpi):
+    """
+    OCR every image named in an image list with one Tesseract subprocess.
+
+    Blocks until a slot in the shared OCR semaphore is free, so the number of
+    Tesseract runs stays bounded no matter how many PDFs are in flight.
+
+    Args:
+        list_path (str): Text file with one image path per line.
+        dpi (int): Resolution the images were rendered at.
+
+    Returns:
+        str: Tesseract output, pages separated by form feeds.
+    """
+    with _OCR_SEM:
+        return pytesseract.image_to_string(list_path, config=f"--dpi {dpi}")
+
+
+def _ocr_text(pdf_doc, ocr_dpi=None, digest=None, force_refresh=False):
     """
-    Perform OCR on PDF by converting pages to images and extracting text.
+    Perform OCR on PDF by rendering pages to images and extracting text.
+
+    Synchronous entry point for `_ocr_text_async`. When the caller already
+    runs an event loop (Jupyter, async web handlers), the coroutine is run on
+    a fresh loop in a helper thread, since asyncio.run refuses to nest.
 
     Args:
-        pdf_path (str): Path to the PDF file.
+        pdf_doc (fitz.Document): Already opened PyMuPDF document.
+        ocr_dpi (int): Fixed render resolution; adaptive per page when None.
+        digest (str): MD5 of the PDF bytes, enables the page cache when set.
+        force_refresh (bool): Ignore cached pages and OCR them again.
 
     Returns:
         str: Extracted text from OCR.
     """
-    images = convert_from_path(pdf_path)
-    text = ""
-    for img in images:
-        text += pytesseract.image_to_string(img)
-    return text
+    coro = _ocr_text_async(pdf_doc, ocr_dpi, digest, force_refresh)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+async def _ocr_text_async(pdf_doc, ocr_dpi=None, digest=None, force_refresh=False):
+    """
+    Perform OCR on all pages of a PDF concurrently.
+
+    Every page is rendered in grayscale at the resolution picked by
+    `_ocr_page_dpi` and binarized with `_prep`. A producer renders pages in
+    chunks while consumers OCR earlier chunks, so rendering overlaps with OCR
+    and only a couple of chunks wait between the two stages. When tesserocr
+    is installed, pages stay in memory and `_TESS_THREADS` consumers OCR them
+    one at a time on `_tesserocr_pool`. Otherwise chunks are written to a
+    temporary folder and OCR_CONCURRENCY consumers (default: CPU count) each
+    run one Tesseract subprocess over an image list, so the model is loaded
+    once per chunk instead of once per page; each chunk's files are deleted
+    as soon as it is OCRed. Every Tesseract run also holds the shared `_OCR_SEM`, so
+    PDFs processed in parallel never exceed OCR_CONCURRENCY runs in total.
+    Pages already in the cache are neither rendered nor OCRed.
+
+    Args:
+        pdf_doc (fitz.Document): Already opened PyMuPDF document.
+        ocr_dpi (int): Fixed render resolution; adaptive per page when None.
+        digest (str): MD5 of the PDF bytes, enables the page cache when set.
+        force_refresh (bool): Ignore cached pages and OCR them again.
+
+    Returns:
+        str: Extracted text from OCR, in page order.
+    """
+    texts = [None] * pdf_doc.page_count
+    # Text OCRed at another resolution differs, so it is cached separately
+    stage = f"ocr_{ocr_dpi or 'auto'}"
+
+    def store_page_text(page_index, text):
+        if digest:
+            _cache_store(digest, page_index + 1, stage, text)
+        texts[page_index] = text
+
+    pending = []
+    for page_index in range(pdf_doc.page_count):
+        if digest and not force_refresh:
+            texts[page_index] = _cache_load(digest, page_index + 1, stage)
+        if texts[page_index] is None:
+            pending.append(page_index)
+
+    loop = asyncio.get_running_loop()
+    if tesserocr is not None:
+        workers, batch_size = _TESS_THREADS, 1  # in-memory pages, handed over one by one
+    else:
+        # Spread the pages evenly over the allowed subprocesses, at least two
+        # chunks each so rendering overlaps OCR, capped per batch
+        workers = _OCR_CONCURRENCY
+        batch_size = max(1, min(_OCR_BATCH_SIZE, math.ceil(len(pending) / (2 * workers))))
+    queue = asyncio.Queue(maxsize=2)  # rendered chunks waiting for Tesseract
+
+    with tempfile.TemporaryDirectory(prefix="pdfextract_ocr_") as tmp_dir:
+
+        async def producer():
+            # Render off the loop so consumers keep dispatching meanwhile; the
+            # chunks are pulled one at a time, so fitz stays on a single thread
+            chunk_dir = tmp_dir if tesserocr is None else None
+            chunks = _iter_pdf_images(pdf_doc, pending, chunk_dir, ocr_dpi, batch_size)
+            while (item := await asyncio.to_thread(next, chunks, None)) is not None:
+                await queue.put(item)
+            for _ in range(workers):
+                await queue.put(None)
+
+        async def consumer():
+            while (item := await queue.get()) is not None:
+                batch_dpi, batch = item
+                if tesserocr is not None:
+                    for page_index, binary in batch:
+                        text = await loop.run_in_executor(_tesserocr_pool(), _tesserocr_text, binary, batch_dpi)
+                        store_page_text(page_index, text)
+                    continue
+                list_path = os.path.join(tmp_dir, f"imglist_{batch[0][0]}.txt")
+                try:
+                    with open(list_path, "w", encoding="utf-8") as f:
+                        f.write("\n".join(img_path for _, img_path in batch) + "\n")
+                    output = await asyncio.to_thread(_tesseract_batch, list_path, batch_dpi)
+                finally:
+                    for _, img_path in batch:
+                        os.remove(img_path)
+                # Tesseract ends every page of a list with a form feed
+                page_texts = output.split("\x0c")
+                for page_index, _ in batch:
+                    store_page_text(page_index, page_texts.pop(0) if page_texts else "")
+
+        await asyncio.gather(producer(), *(consumer() for _ in range(workers)))
+
+    return "".join(texts)
+
+
+def _has_borderless_table(page):
+    """
+    Check a pdfplumber page for a table drawn without ruling lines.
+
+    Words are grouped into lines, and a gap wider than `_TABLE_GAP_CHARS`
+    average characters counts as a column gutter. The page qualifies when at
+    least `_TABLE_MIN_ROWS` lines have overlapping gutters, which ordinary
+    single-spaced prose does not.
+
+    Args:
+        page (pdfplumber.page.Page): Page to probe.
+
+    Returns:
+        bool: True when Camelot's stream flavor should look at the page.
+    """
+    lines = []
+    for word in page.extract_words():
+        if lines and abs(word["top"] - lines[-1][-1]["top"]) < 3:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+
+    gutters = []
+    for line in lines:
+        char_width = sum(w["x1"] - w["x0"] for w in line) / sum(len(w["text"]) for w in line)
+        gutters.append([
+            (left["x1"], right["x0"])
+            for left, right in zip(line, line[1:])
+            if right["x0"] - left["x1"] > _TABLE_GAP_CHARS * char_width
+        ])
+
+    for line_gutters in gutters:
+        for x0, x1 in line_gutters:
+            rows = sum(any(g0 < x1 and x0 < g1 for g0, g1 in other) for other in gutters)
+            if rows >= _TABLE_MIN_ROWS:
+                return True
+    return False
 
 
 def save_txt(text, output_path):
@@ -84,7 +500,7 @@ def save_csv_camelot(dataframes, output_path):
     with open(output_path, "w", encoding="utf-8") as f:
         for idx, df in enumerate(dataframes):
             f.write(f"--- Table {idx + 1} ---\n")
-            f.write(df.to_csv(index=False))
+            df.to_csv(f, index=False)
             f.write("\n")
 
 
@@ -96,12 +512,35 @@ def save_json_camelot(dataframes, output_path):
         dataframes (list): List of pandas DataFrames.
         output_path (str): File path to save JSON.
     """
-    all_data = [df.to_dict(orient="records") for df in dataframes]
+    if not dataframes:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump([], f)
+        return
+    # Same layout as json.dump(all_tables, f, indent=2), one table in memory at a time
     with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(all_data, f, indent=2)
+        f.write("[\n")
+        for idx, df in enumerate(dataframes):
+            if idx:
+                f.write(",\n")
+            table_json = json.dumps(df.to_dict(orient="records"), indent=2)
+            f.write("\n".join("  " + line for line in table_json.splitlines()))
+        f.write("\n]")
 
 
-def extract_from_pdf(file_path, method="auto", output_folder="extracted_output"):
+def save_excel_camelot(dataframes, output_path):
+    """
+    Save multiple Camelot DataFrames to one Excel workbook, one sheet per table.
+
+    Args:
+        dataframes (list): List of pandas DataFrames.
+        output_path (str): File path to save the XLSX workbook.
+    """
+    with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
+        for idx, df in enumerate(dataframes):
+            df.to_excel(writer, sheet_name=f"Table_{idx + 1}", index=False)
+
+
+def extract_from_pdf(file_path, method="auto", output_folder="extracted_output", force_refresh=False, ocr_dpi=None):
     """
     Extract content from PDF using various methods.
 
@@ -109,6 +548,8 @@ def extract_from_pdf(file_path, method="auto", output_folder="extracted_output")
         file_path (str): Path to the PDF file.
         method (str): Extraction method: auto, csv, json, txt, excel, unstructured.
         output_folder (str): Folder to save extracted outputs.
+        force_refresh (bool): Ignore cached OCR/table results and recompute them.
+        ocr_dpi (int): Fixed OCR render resolution; picked per page from its size when None.
 
     Returns:
         str: Success message with saved file path(s).
@@ -122,150 +563,231 @@ def extract_from_pdf(file_path, method="auto", output_folder="extracted_output")
     all_tables_camelot = []
     full_text_pdfplumber = ""
     image_paths = []
-    pages_count = 0
 
-    # Extract text using pdfplumber
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            pages_count = len(pdf.pages)
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    full_text_pdfplumber += text + "\n"
-    except Exception as e:
-        print(f"Warning: Text extraction with pdfplumber failed: {e}")
-
-    # Extract images using PyMuPDF
-    try:
-        image_paths = extract_images_from_pdf(file_path, output_folder)
-        if image_paths:
-            print(f"🖼️ Extracted {len(image_paths)} images: {image_paths}")
-    except Exception as e:
-        print(f"Warning: Image extraction failed: {e}")
+    # Read the file once; PyMuPDF and pdfplumber both parse from this buffer
+    with open(file_path, "rb") as f:
+        pdf_bytes = f.read()
+    digest = hashlib.md5(pdf_bytes).hexdigest()
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_doc:
+        pages_count = pdf_doc.page_count
+
+        # Text, images and tables come from independent parsers, so run them side by side
+        def extract_text():
+            full_text_parts = []
+            ruled_pages = []
+            candidate_pages = []
+            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+                for page in pdf.pages:
+                    text = page.extract_text()
+                    if text:
+                        full_text_parts.append(text)
+                    # The page is already parsed, so note whether Camelot should look at it.
+                    # find_tables() only sees ruled tables; borderless ones are caught
+                    # by their column gutters and left to Camelot's stream flavor.
+                    if page.find_tables():
+                        ruled_pages.append(page.page_number)
+                        candidate_pages.append(page.page_number)
+                    elif _has_borderless_table(page):
+                        candidate_pages.append(page.page_number)
+            return "\n".join(full_text_parts), ruled_pages, candidate_pages
+
+        def extract_images():
+            # Only this stage touches pdf_doc while the pool is running
+            return extract_images_from_pdf(pdf_doc, base_name, output_folder)
+
+        def extract_tables():
+            # Camelot re-renders every page it is given, so only pass pages
+            # pdfplumber found a table on during the text pass: ruled pages to
+            # lattice, then every candidate lattice found nothing on to stream
+            try:
+                _, ruled_pages, tbl_pages = text_future.result()
+            except Exception:
+                ruled_pages = tbl_pages = range(1, pages_count + 1)
+
+            rows_by_page = {}
+            if not force_refresh:
+                for page_num in tbl_pages:
+                    cached = _cache_load(digest, page_num, _TABLES_STAGE)
+                    if cached is not None:
+                        rows_by_page[page_num] = cached
+            missing_pages = [page_num for page_num in tbl_pages if page_num not in rows_by_page]
+
+            if missing_pages:
+                # Camelot reads the original file, no copy needed
+                lattice_pages = [page_num for page_num in missing_pages if page_num in ruled_pages]
+                tables = []
+                if lattice_pages:
+                    tables += camelot.read_pdf(file_path, flavor="lattice", pages=",".join(map(str, lattice_pages)))
+                found_pages = {int(table.page) for table in tables}
+                stream_pages = [page_num for page_num in missing_pages if page_num not in found_pages]
+                if stream_pages:
+                    tables += camelot.read_pdf(file_path, flavor="stream", pages=",".join(map(str, stream_pages)))
+                for page_num in missing_pages:
+                    rows_by_page[page_num] = []
+                for table in tables:
+                    rows_by_page[int(table.page)].append(table.df.values.tolist())
+                # Only a page Camelot actually read has a trustworthy result, empty or not
+                for page_num in set(lattice_pages) | set(stream_pages):
+                    _cache_store(digest, page_num, _TABLES_STAGE, rows_by_page[page_num])
+
+            return [pd.DataFrame(rows) for page_num in tbl_pages for rows in rows_by_page[page_num]]
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            text_future = pool.submit(extract_text)
+            images_future = pool.submit(extract_images)
+            tables_future = pool.submit(extract_tables)  # waits for text_future's page list
+            wait([text_future, images_future, tables_future])
+
+        # Extract text using pdfplumber
+        try:
+            full_text_pdfplumber, _, _ = text_future.result()
+        except Exception as e:
+            print(f"Warning: Text extraction with pdfplumber failed: {e}")
+
+        # Extract images using PyMuPDF
+        try:
+            image_paths = images_future.result()
+            if image_paths:
+                print(f"🖼️ Extracted {len(image_paths)} images: {image_paths}")
+        except Exception as e:
+            print(f"Warning: Image extraction failed: {e}")
+
+        # Extract tables using Camelot
+        try:
+            all_tables_camelot = tables_future.result()
+        except Exception as e:
+            print(f"Warning: Camelot table extraction failed: {e}")
+
+        # Summary info to print after extraction
+        def print_summary():
+            print("\n=== Extraction Summary ===")
+            print(f"PDF file: {file_path}")
+            print(f"Pages processed: {pages_count}")
+            print(f"Tables found: {len(all_tables_camelot)}")
+            print(f"Images saved: {len(image_paths)}")
+            print("==========================\n")
+
+        # Choose output based on method
+        if method == "csv":
+            if all_tables_camelot:
+                output_path = os.path.join(output_folder, f"{base_name}_tables.csv")
+                save_csv_camelot(all_tables_camelot, output_path)
+                print_summary()
+                return f"✅ CSV saved to: {output_path}"
+            else:
+                raise ValueError("❌ No tables found for CSV export using Camelot.")
 
-    # Extract tables using Camelot
-    try:
-        tables = camelot.read_pdf(file_path, flavor="stream", pages="all")
-        if not tables:
-            tables = camelot.read_pdf(file_path, flavor="lattice", pages="all")
-        for table in tables:
-            all_tables_camelot.append(table.df)
-    except Exception as e:
-        print(f"Warning: Camelot table extraction failed: {e}")
-
-    # Summary info to print after extraction
-    def print_summary():
-        print("\n=== Extraction Summary ===")
-        print(f"PDF file: {file_path}")
-        print(f"Pages processed: {pages_count}")
-        print(f"Tables found: {len(all_tables_camelot)}")
-        print(f"Images saved: {len(image_paths)}")
-        print("==========================\n")
-
-    # Choose output based on method
-    if method == "csv":
-        if all_tables_camelot:
-            output_path = os.path.join(output_folder, f"{base_name}_tables.csv")
-            save_csv_camelot(all_tables_camelot, output_path)
-            print_summary()
-            return f"✅ CSV saved to: {output_path}"
-        else:
-            raise ValueError("❌ No tables found for CSV export using Camelot.")
-
-    elif method == "json":
-        if all_tables_camelot:
-            output_path = os.path.join(output_folder, f"{base_name}_tables.json")
-            save_json_camelot(all_tables_camelot, output_path)
-            print_summary()
-            return f"✅ JSON saved to: {output_path}"
-        else:
-            raise ValueError("❌ No tables found for JSON export using Camelot.")
-
-    elif method == "txt":
-        if full_text_pdfplumber.strip():
-            output_path = os.path.join(output_folder, f"{base_name}.txt")
-            save_txt(full_text_pdfplumber, output_path)
-            print_summary()
-            return f"✅ Text saved to: {output_path}"
-        else:
-            ocr_text = _ocr_text(file_path)
-            output_path = os.path.join(output_folder, f"{base_name}_ocr.txt")
-            save_txt(ocr_text, output_path)
-            print_summary()
-            return f"✅ OCR text saved to: {output_path}"
-
-    elif method == "excel":
-        if all_tables_camelot:
-            output_messages = []
-            for i, df in enumerate(all_tables_camelot):
-                excel_file = os.path.join(output_folder, f"{base_name}_table_{i + 1}.xlsx")
-                df.to_excel(excel_file, index=False)
-                output_messages.append(f"Saved table {i + 1} to {excel_file}")
-            print_summary()
-            return "✅ " + "\n✅ ".join(output_messages)
-        else:
-            raise ValueError("❌ No tables found for Excel export using Camelot.")
-
-    elif method == "auto":
-        if all_tables_camelot:
-            output_messages = []
-            for i, df in enumerate(all_tables_camelot):
-                excel_file = os.path.join(output_folder, f"{base_name}_table_{i + 1}.xlsx")
-                df.to_excel(excel_file, index=False)
-                output_messages.append(f"Saved table {i + 1} to {excel_file}")
-            print_summary()
-            return "✅ Auto-detected: Tables → Excel files saved:\n" + "\n".join(output_messages)
-
-        elif full_text_pdfplumber.strip():
-            output_path = os.path.join(output_folder, f"{base_name}.txt")
-            save_txt(full_text_pdfplumber, output_path)
-            print_summary()
-            return f"✅ Auto-detected: Text → TXT saved to: {output_path}"
+        elif method == "json":
+            if all_tables_camelot:
+                output_path = os.path.join(output_folder, f"{base_name}_tables.json")
+                save_json_camelot(all_tables_camelot, output_path)
+                print_summary()
+                return f"✅ JSON saved to: {output_path}"
+            else:
+                raise ValueError("❌ No tables found for JSON export using Camelot.")
 
-        else:
-            ocr_text = _ocr_text(file_path)
-            if ocr_text.strip():
+        elif method == "txt":
+            if full_text_pdfplumber.strip():
+                output_path = os.path.join(output_folder, f"{base_name}.txt")
+                save_txt(full_text_pdfplumber, output_path)
+                print_summary()
+                return f"✅ Text saved to: {output_path}"
+            else:
+                ocr_text = _ocr_text(pdf_doc, ocr_dpi, digest=digest, force_refresh=force_refresh)
                 output_path = os.path.join(output_folder, f"{base_name}_ocr.txt")
                 save_txt(ocr_text, output_path)
                 print_summary()
-                return f"✅ Auto-detected: OCR text saved to: {output_path}"
+                return f"✅ OCR text saved to: {output_path}"
+
+        elif method == "excel":
+            if all_tables_camelot:
+                output_path = os.path.join(output_folder, f"{base_name}_tables.xlsx")
+                save_excel_camelot(all_tables_camelot, output_path)
+                print_summary()
+                return f"✅ Excel saved to: {output_path}"
             else:
-                try:
-                    elements = partition_pdf(file_path, strategy="fast")
-                    structured_text = "\n\n".join(
-                        f"[{el.category}] {el.text.strip()}" for el in elements if el.text
-                    )
-                    if structured_text.strip():
-                        output_path = os.path.join(output_folder, f"{base_name}_structured.txt")
-                        save_txt(structured_text, output_path)
-                        print_summary()
-                        return f"✅ Auto-detected: Structured parsing (unstructured) → saved to: {output_path}"
-                    else:
-                        raise ValueError("❌ No content found in PDF even with unstructured parsing.")
-                except Exception as e:
-                    raise ValueError(f"❌ Final fallback failed: {e}")
-
-    elif method == "unstructured":
-        elements = partition_pdf(file_path, strategy="fast")
-        structured_text = "\n\n".join(f"[{el.category}] {el.text.strip()}" for el in elements if el.text)
-        if structured_text.strip():
-            output_path = os.path.join(output_folder, f"{base_name}_structured.txt")
-            save_txt(structured_text, output_path)
-            print_summary()
-            return f"✅ Unstructured text saved to: {output_path}"
+                raise ValueError("❌ No tables found for Excel export using Camelot.")
+
+        elif method == "auto":
+            if all_tables_camelot:
+                output_path = os.path.join(output_folder, f"{base_name}_tables.xlsx")
+                save_excel_camelot(all_tables_camelot, output_path)
+                print_summary()
+                return f"✅ Auto-detected: Tables → Excel saved to: {output_path}"
+
+            elif full_text_pdfplumber.strip():
+                output_path = os.path.join(output_folder, f"{base_name}.txt")
+                save_txt(full_text_pdfplumber, output_path)
+                print_summary()
+                return f"✅ Auto-detected: Text → TXT saved to: {output_path}"
+
+            else:
+                ocr_text = _ocr_text(pdf_doc, ocr_dpi, digest=digest, force_refresh=force_refresh)
+                if ocr_text.strip():
+                    output_path = os.path.join(output_folder, f"{base_name}_ocr.txt")
+                    save_txt(ocr_text, output_path)
+                    print_summary()
+                    return f"✅ Auto-detected: OCR text saved to: {output_path}"
+                else:
+                    try:
+                        # pdfminer.six ships with pdfplumber, so this costs no extra import time
+                        from pdfminer.high_level import extract_text as pdfminer_extract_text
+
+                        miner_text = pdfminer_extract_text(io.BytesIO(pdf_bytes))
+                        if miner_text.strip():
+                            output_path = os.path.join(output_folder, f"{base_name}_pdfminer.txt")
+                            save_txt(miner_text, output_path)
+                            print_summary()
+                            return f"✅ Auto-detected: Text (pdfminer) → saved to: {output_path}"
+                        else:
+                            raise ValueError("❌ No content found in PDF even with pdfminer parsing.")
+                    except Exception as e:
+                        raise ValueError(f"❌ Final fallback failed: {e}")
+
+        elif method == "unstructured":
+            # Heavy import (models and their dependencies), only pay for it when asked
+            from unstructured.partition.pdf import partition_pdf
+
+            elements = partition_pdf(file_path, strategy="fast")
+            structured_text = "\n\n".join(f"[{el.category}] {el.text.strip()}" for el in elements if el.text)
+            if structured_text.strip():
+                output_path = os.path.join(output_folder, f"{base_name}_structured.txt")
+                save_txt(structured_text, output_path)
+                print_summary()
+                return f"✅ Unstructured text saved to: {output_path}"
+            else:
+                raise ValueError("❌ No content found in PDF using unstructured method.")
+
         else:
-            raise ValueError("❌ No content found in PDF using unstructured method.")
+            raise ValueError("❌ Invalid method. Choose from: auto, csv, json, txt, excel, unstructured.")
 
-    else:
-        raise ValueError("❌ Invalid method. Choose from: auto, csv, json, txt, excel, unstructured.")
+
+def _init_worker(ocr_sem):
+    """
+    Install the parent's OCR semaphore in a pool worker process.
+
+    Args:
+        ocr_sem (multiprocessing.BoundedSemaphore): Semaphore shared by all workers.
+    """
+    global _OCR_SEM
+    _OCR_SEM = ocr_sem
+
+
+# Worker processes for process_pdf_async; Tesseract wants ~4 cores per process
+_POOL = ProcessPoolExecutor(
+    max_workers=max(1, (os.cpu_count() or 1) // 4),
+    initializer=_init_worker,
+    initargs=(_OCR_SEM,),
+)
 
 
-async def process_pdf_async(file_path, method="auto", output_folder="extracted_output"):
+async def process_pdf_async(file_path, method="auto", output_folder="extracted_output", force_refresh=False, ocr_dpi=None):
     loop= asyncio.get_running_loop()
     result = await loop.run_in_executor(
-        None,
+        _POOL,
         extract_from_pdf,
-        file_path, method, output_folder  # pass arguments
+        file_path, method, output_folder, force_refresh, ocr_dpi  # pass arguments
     )
     print(result)  # show summary after completion
     return result